@@ -8,6 +8,7 @@ from caffe2.python import core
 from caffe2.proto import caffe2_pb2
 import benchmark_core
 import benchmark_utils
+import numpy as np
 
 """Caffe2 performance microbenchmarks.
 
@@ -25,6 +26,8 @@ class Caffe2BenchmarkBase(object):
     def __init__(self):
         self.args = {}
         self.user_provided_name = None
+        self.rng = np.random
+        self.random_seed = None
 
     def _device_option(self, device):
         """ This method is used to set device option.
@@ -52,10 +55,29 @@ class Caffe2BenchmarkBase(object):
         blob_name = 'blob_' + str(Caffe2BenchmarkBase.tensor_index)
         dev = self._device_option(device)
         with core.DeviceScope(dev):
-            workspace.FeedBlob(blob_name, benchmark_utils.numpy_random(dtype, *shapes))
+            workspace.FeedBlob(blob_name, self.rng.rand(*shapes).astype(dtype))
         Caffe2BenchmarkBase.tensor_index += 1
         return blob_name
 
+    def set_random_seed(self, seed):
+        """ This is called with a seed derived from the test before init, and
+            again before prepare_inputs, so that the blobs filled by tensor
+            remain the same for each test case.
+        """
+        self.random_seed = seed
+        self.rng = benchmark_utils.random_state(seed)
+
+    def prepare_inputs(self, rng):
+        """ This is called once right before a test is warmed up and measured,
+            the default does nothing. Input blobs should be fed in init, the
+            operator then reuses them for every run so nothing is allocated in
+            the timed loop. Only override this method for inputs too large to
+            keep for every registered test, it only runs for the selected
+            tests. rng is self.rng re-seeded for the test, so these inputs are
+            the same on every run.
+        """
+        pass
+
     def module_name(self):
         """ this is used to label the operator being benchmarked
         """
@@ -97,7 +119,7 @@ class Caffe2OperatorTestCase(object):
     """ This class includes all the information needed to benchmark an operator. 
         op_bench: it's a user-defined class (child of Caffe2BenchmarkBase) 
         which includes input and operator, .etc
-        test_config: a namedtuple includes test_name, input_shape, tag, run_backward.
+        test_config: a TestConfig includes test_name, input_shape, tag, run_backward.
         When run_backward is false, the run_forward method will be executed, otherwise
         run_backward method will be executed. 
     """
@@ -3,30 +3,74 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import collections
 import functools
+import multiprocessing
 import numpy as np
+import os
+import sys
+import time
 import timeit
 import json
+import torch
 
+from caffe2.proto import caffe2_pb2
 import benchmark_utils
-from collections import namedtuple
 
 """Performance microbenchmarks.
 
 This module contains core functionalities for performance microbenchmark tests.
+The runner pins the number of PyTorch threads (and optionally the CPU) before
+measuring. MKL and OpenMP read their thread counts from the environment, set
+them through the --mkl_num_threads and --omp_num_threads flags which export
+MKL_NUM_THREADS and OMP_NUM_THREADS.
 """
 
-"""
-This is used to store configs of tests 
-An example input is: 
-TestConfig(test_name='add_M8_N2_K1', input_config='M: 8, N: 2, K: 1', 
-    tag='long', run_backward=False)
-"""
-TestConfig = namedtuple("TestConfig", "test_name input_config tag run_backward")
+class TestConfig(object):
+    """
+    This is used to store configs of tests 
+    An example input is: 
+    TestConfig(test_name='add_M8_N2_K1', input_config='M: 8, N: 2, K: 1', 
+        tag='long', run_backward=False)
+    Its string form is computed once at construction.
+    """
+    __slots__ = ('test_name', 'input_config', 'tag', 'run_backward', '_cached_str')
+
+    def __init__(self, test_name, input_config, tag, run_backward):
+        self.test_name = test_name
+        self.input_config = input_config
+        self.tag = tag
+        self.run_backward = run_backward
+        # The string is used to build the unique id of a test, compute it once
+        self._cached_str = (
+            "TestConfig(test_name={!r}, input_config={!r}, tag={!r}, "
+            "run_backward={!r})".format(test_name, input_config, tag, run_backward))
+
+    def __str__(self):
+        return self._cached_str
+
+    __repr__ = __str__
 
 
 BENCHMARK_TESTER = {}
 
+# Indexes from operator name, tag and framework to the ids of the registered
+# tests, used to select the tests matching the filters without visiting all
+# the registered tests.
+_BY_OP = collections.defaultdict(list)
+_BY_TAG = collections.defaultdict(list)
+_BY_FRAMEWORK = collections.defaultdict(list)
+
+# Output templates, they are built once instead of for every reported result.
+# The AI-PEP template produces the same text as json.dumps of the record, the
+# type field is passed in already JSON encoded.
+_AI_PEP_TEMPLATE = ('Caffe2Observer {{"type": {type}, "metric": "{metric}", '
+                    '"unit": "{unit}", "value": "{value}"}}\n')
+_RESULT_TEMPLATE = ("{mode} Execution Time (us) : {time:.3f}\n"
+                    "{mode} Execution Time CV (%) : {cv:.3f}\n\n")
+_RUN_RESULT_TEMPLATE = ("Run: {run}, {mode} Execution Time (us) : {time:.3f}\n"
+                        "Run: {run}, {mode} Execution Time CV (%) : {cv:.3f}\n")
+
 
 def _register_test(test_case):
     """ This method is used to register test. func_name is a global unique 
@@ -41,10 +85,114 @@ def _register_test(test_case):
     """
     test_config = test_case.test_config
     op = test_case.op_bench
-    func_name = "{}{}{}".format(op.module_name(), test_case.framework, str(test_config))
+    func_name = "{}{}{}".format(op.module_name(), test_case.framework, test_config._cached_str)
+    if func_name not in BENCHMARK_TESTER:
+        _BY_OP[op.module_name()].append(func_name)
+        _BY_TAG[test_config.tag].append(func_name)
+        _BY_FRAMEWORK[test_case.framework].append(func_name)
     BENCHMARK_TESTER[func_name] = test_case
 
 
+def _make_pt_fwd(test_case, use_jit):
+    """ Return the function running the forward path of a PyTorch test case
+    in the requested mode.
+    """
+    if use_jit:
+        return test_case.run_jit_forward
+    return test_case.run_forward
+
+
+def _make_c2_fwd(test_case, use_jit):
+    """ Return the function running the forward path of a Caffe2 test case.
+    Caffe2 doesn't have a JIT mode so use_jit is ignored.
+    """
+    return test_case.run_forward
+
+
+def _make_pt_bwd_prepare(test_case):
+    """ Return the function generating the output of a PyTorch test case
+    which the backward path starts from.
+    """
+    run_forward = test_case.run_forward
+    output_mean = test_case._output_mean
+
+    def prepare():
+        run_forward(1)
+        output_mean()
+    return prepare
+
+
+def _make_c2_bwd_prepare(test_case):
+    """ Return the function running the forward path of a Caffe2 test case
+    before the backward path.
+    """
+    run_forward = test_case.run_forward
+
+    def prepare():
+        run_forward(1)
+    return prepare
+
+
+def _default_timer_ns():
+    return int(timeit.default_timer() * 1e9)
+
+
+# Integer nanosecond clock of the measurement, time.perf_counter_ns is only
+# available on Python 3.7+.
+_timer_ns = getattr(time, 'perf_counter_ns', _default_timer_ns)
+
+
+def _make_timer(func, n, timer=timeit.default_timer):
+    """ Return a timeit.Timer which calls func(n). The statement is compiled
+    with func and n as its globals where timeit supports it (Python 3.5+),
+    older versions time a functools.partial instead.
+    """
+    if sys.version_info >= (3, 5):
+        return timeit.Timer(stmt='fn(n)', timer=timer, globals={'fn': func, 'n': n})
+    return timeit.Timer(functools.partial(func, n), timer=timer)
+
+
+def _autorange(timer):
+    """ Return the number of loops of timer which take at least 0.2 seconds and
+    the time they took. This is timeit.Timer.autorange, which is only available
+    on Python 3.6+, the same algorithm is used on older versions.
+    """
+    if hasattr(timer, 'autorange'):
+        return timer.autorange()
+    i = 1
+    while True:
+        for j in 1, 2, 5:
+            number = i * j
+            time_taken = timer.timeit(number)
+            if time_taken >= 0.2:
+                return number, time_taken
+        i *= 10
+
+
+_WORKER_RUNNER = None
+
+
+def _init_worker(args, worker_counter, cpu_sets):
+    """ Initialize a worker process of a parallel run. The tests have been
+    registered again when the benchmark modules were imported by the worker.
+    """
+    global _WORKER_RUNNER
+    # Set up Caffe2 the same way benchmark_runner.main does for a serial run,
+    # the environment (OMP/MKL thread counts) is inherited from the parent.
+    if benchmark_utils.is_caffe2_enabled(args.framework):
+        benchmark_utils.init_caffe2_workspace()
+    _WORKER_RUNNER = BenchmarkRunner(args)
+    with worker_counter.get_lock():
+        worker_id = worker_counter.value
+        worker_counter.value += 1
+    if cpu_sets is not None:
+        os.sched_setaffinity(0, cpu_sets[worker_id % len(cpu_sets)])
+
+
+def _run_in_worker(full_test_id):
+    return _WORKER_RUNNER._run_one(full_test_id, BENCHMARK_TESTER[full_test_id])
+
+
 class BenchmarkRunner(object):
     """BenchmarkRunner is responsible for benchmarking all the registered
     benchmark test groups.
@@ -60,13 +208,43 @@ class BenchmarkRunner(object):
     def __init__(self, args):
         # TODO: consider time-bound constraints as well.
         self.args = args
+        # Fix the number of threads and the CPU the benchmark runs on to
+        # reduce the variance between runs.
+        num_threads = self.args.num_threads
+        if num_threads is None:
+            num_threads = self.args.omp_num_threads or 1
+        if num_threads:
+            torch.set_num_threads(num_threads)
+            try:
+                torch.set_num_interop_threads(1)
+            except RuntimeError:
+                # The number of inter-op threads can only be set once per
+                # process and before any inter-op work, e.g. it is already
+                # set when a second runner is created.
+                pass
+        # With --jobs the workers are pinned to their own CPUs instead, so
+        # only pin the process here if the tests run serially.
+        if self.args.jobs <= 1:
+            self._pin_cpu()
         self.iters = 100
         self.has_explicit_iteration_count = False
         self.multiplier = 2
-        self.predefined_minimum_secs = 4
+        # timeit.Timer.autorange grows the number of loops until they run for
+        # at least 0.2 seconds, use the same threshold for the measurement.
+        # Times are kept as integer nanoseconds.
+        self.predefined_minimum_ns = 200 * 1000 * 1000
         self.max_iters = 1e6
+        # The autograd profiler records every operator it sees, so it only
+        # runs a few iterations and the time is scaled to the full count.
+        self.profiler_iters = 10
         self.use_jit = args.use_jit
         self.num_runs = args.num_runs
+        self.min_time_per_test_ns = int(args.min_time_per_test * 1e9)
+        self.warmup_iters = args.warmup_iterations
+        # The JIT profiling executor only specializes a graph after two
+        # profiling runs, so never warm up PyTorch tests with fewer runs.
+        self.pt_warmup_iters = max(args.warmup_iterations, args.min_warmup_runs)
+        self._timers = {}
         if self.args.iterations:
             self.has_explicit_iteration_count = True
             self.iters = self.args.iterations
@@ -88,26 +266,25 @@ class BenchmarkRunner(object):
         elif self.args.list_ops:
             print("# List of Operators to run:")
             if self.args.operator is None:
-                ops = set(test_case.op_bench.module_name()
-                          for _, test_case in BENCHMARK_TESTER.items())
-                for op in ops: 
+                for op in _BY_OP: 
                     print("# {}".format(op))
             else:
                 print("# {}".format(self.args.operator))
 
-    def _print_perf_result(self, reported_run_time_us, test_case):
+    def _print_perf_result(self, reported_run_time_us, reported_cv, compile_time, test_case):
+        write = sys.stdout.write
         if self.args.ai_pep_format:
             # Output for AI-PEP
-            test_name = '_'.join([test_case.framework, test_case.test_config.test_name])
+            test_name = json.dumps(
+                '_'.join([test_case.framework, test_case.test_config.test_name]))
+            if compile_time is not None:
+                write(_AI_PEP_TEMPLATE.format(
+                    type=test_name, metric="compile_time", unit="s",
+                    value=compile_time))
             for run in range(self.num_runs): 
-                print("Caffe2Observer " + json.dumps(
-                    {
-                        "type": test_name,
-                        "metric": "latency",
-                        "unit": "us",
-                        "value": str(reported_run_time_us[run]),
-                    }
-                ))
+                write(_AI_PEP_TEMPLATE.format(
+                    type=test_name, metric="latency", unit="us",
+                    value=reported_run_time_us[run]))
         else:
             if test_case.framework == "PyTorch":
                 print("# Mode: {}".format("JIT" if self.use_jit else "Eager"))
@@ -117,73 +294,225 @@ class BenchmarkRunner(object):
                       test_case.test_config.test_name,
                       test_case.test_config.input_config))
 
+            if compile_time is not None:
+                print("Compile Time (s) : {:.3f}".format(compile_time))
+
             mode = "Backward" if test_case.test_config.run_backward else "Forward"
             if self.num_runs > 1: 
                 for run in range(self.num_runs): 
-                    print("Run: {}, {} Execution Time (us) : {:.3f}".format(
-                        run,
-                        mode, reported_run_time_us[run]))
-                print()
+                    write(_RUN_RESULT_TEMPLATE.format(
+                        run=run, mode=mode, time=reported_run_time_us[run],
+                        cv=100 * reported_cv[run]))
+                write("\n")
             else: 
-                print("{} Execution Time (us) : {:.3f}\n".format(
-                    mode, reported_run_time_us[0]))
+                write(_RESULT_TEMPLATE.format(
+                    mode=mode, time=reported_run_time_us[0],
+                    cv=100 * reported_cv[0]))
 
     def _predict_num_iter_needed(self, i):
         return (i * self.multiplier)
 
-    def _iteration_result_is_significant(self, iters, run_time_sec, curr_test_total_time, has_explicit_iteration_count):
+    def _iteration_result_is_significant(self, iters, run_time_ns, run_time_cv, cv_retries,
+                                         curr_test_total_ns, has_explicit_iteration_count):
         """ This function decides whether the measured time can be reported based on the 
         following conditions: 1) the number of iterations is larger than the max_iters.
-        2) the execution time is larger than the predefined minimum_time
+        2) the execution time is larger than the predefined minimum_time and the
+        coefficient of variation across repeats is below max_cv, or the iteration
+        count has already been increased max_cv_retries times because of the CV
         3) the execution time is larger than user defined minimum_time 
         """
         return ((iters > self.max_iters or
-                run_time_sec > self.predefined_minimum_secs or 
+                (run_time_ns > self.predefined_minimum_ns and
+                 (run_time_cv <= self.args.max_cv or
+                  cv_retries >= self.args.max_cv_retries)) or
                 has_explicit_iteration_count) and
-                curr_test_total_time > self.args.min_time_per_test)
+                curr_test_total_ns > self.min_time_per_test_ns)
+
+    def _pin_cpu(self):
+        if self.args.pin_cpu is not None and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, {self.args.pin_cpu})
+
+    def _is_gpu_test(self, test_case):
+        """ Check whether a test case of any framework runs on a GPU.
+        """
+        if test_case.framework == "Caffe2":
+            dev = getattr(test_case.op_bench, 'dev', None)
+            return dev is not None and dev.device_type == caffe2_pb2.CUDA
+        return self._is_cuda_test(test_case)
+
+    def _is_cuda_test(self, test_case):
+        """ Check whether the tensors of a PyTorch test case live on a GPU.
+        """
+        return (test_case.framework == "PyTorch" and
+                torch.cuda.is_available() and
+                torch.device(test_case.op_bench.device).type == 'cuda')
+
+    def _bind_launchers(self, test_case):
+        """ Resolve the framework and mode specific functions of a test case
+        once, so that the launch functions don't need to branch on them.
+        This happens when the test is run rather than in _register_test because
+        the mode is only known after the command line has been parsed.
+        """
+        if test_case.framework == "PyTorch":
+            test_case._launch_fwd = _make_pt_fwd(test_case, self.use_jit)
+            test_case._prepare_bwd = _make_pt_bwd_prepare(test_case)
+        else:
+            test_case._launch_fwd = _make_c2_fwd(test_case, self.use_jit)
+            test_case._prepare_bwd = _make_c2_bwd_prepare(test_case)
+        test_case._launch_bwd = test_case.run_backward
+        test_case._is_cuda = self._is_cuda_test(test_case)
+
+    def _get_timer(self, func, iters):
+        """ Return a timeit.Timer which calls func(iters). The compiled timer is
+        cached until the test finishes, so it is reused by the repeats and
+        retries of a measurement.
+        """
+        key = (func, iters)
+        if key not in self._timers:
+            self._timers[key] = _make_timer(func, iters, timer=_timer_ns)
+        return self._timers[key]
+
+    def _profile_call(self, timer):
+        """ Run timer's statement under the autograd profiler and return the CUDA
+        time (unit: nanosecond) of the operators it recorded, which leaves out the
+        host-side launch and synchronization overhead. Only top-level operators
+        are summed because the CUDA time of an operator covers the operators it
+        calls.
+        """
+        with torch.autograd.profiler.profile(use_cuda=True) as prof:
+            timer.timeit(number=1)
+        events = prof.function_events
+        events.populate_cpu_children()
+        children = set(id(child) for event in events for child in event.cpu_children)
+        cuda_time_us = sum(event.cuda_time_total for event in events
+                           if id(event) not in children)
+        return int(cuda_time_us * 1e3)
+
+    def _time_call(self, test_case, func, iters):
+        """ Measure the execution time (unit: nanosecond) of func(iters). CUDA
+        events (or the autograd profiler with --use_autograd_profiler) are used for
+        GPU test cases so that only the device-side execution is measured, otherwise
+        the host wall clock is used.
+        """
+        if test_case._is_cuda and self.args.use_autograd_profiler:
+            if iters == 0:
+                return 0
+            profiled_iters = min(iters, self.profiler_iters)
+            profiled_time = self._profile_call(self._get_timer(func, profiled_iters))
+            return profiled_time * iters // profiled_iters
+
+        timer = self._get_timer(func, iters)
+
+        if test_case._is_cuda:
+            torch.cuda.synchronize()
+            start_event = torch.cuda.Event(enable_timing=True)
+            end_event = torch.cuda.Event(enable_timing=True)
+            start_event.record()
+            timer.timeit(number=1)
+            end_event.record()
+            torch.cuda.synchronize()
+            return int(start_event.elapsed_time(end_event) * 1e6)
+
+        return timer.timeit(number=1)
 
     def _launch_forward(self, test_case, iters):
-        """ Use Python's timeit module to measure execution time (unit: second).
+        """ Measure the execution time (unit: nanosecond) of the forward path.
         """
-        func = test_case.run_forward
-        if self.use_jit:
-            func = test_case.run_jit_forward
-        forward_time = timeit.timeit(functools.partial(func, iters), number=1)
+        forward_time = self._time_call(test_case, test_case._launch_fwd, iters)
         return forward_time
 
     def _launch_backward(self, test_case, iters):
-        """ This function runs forward path of an op to get an output. Then the backward path is executed 
-        and the execution time is reported
+        """ Measure the execution time (unit: nanosecond) of the backward path. The
+        output it starts from is generated once per test by _run_one.
         """
-        test_case.run_forward(num_runs=1)
-        if test_case.framework == "PyTorch":
-            test_case._output_mean()
-        backward_time = timeit.timeit(functools.partial(test_case.run_backward, iters), number=1)
+        backward_time = self._time_call(test_case, test_case._launch_bwd, iters)
         return backward_time
 
+    def _autorange_iters(self, test_case):
+        """ Use timeit.Timer.autorange to find the number of iterations of the
+        operator which takes at least predefined_minimum_ns, so that the
+        measurement doesn't need to double the iteration count from a fixed
+        starting point.
+        """
+        func = test_case._launch_fwd
+        if test_case.test_config.run_backward:
+            func = test_case._launch_bwd
+        timer = _make_timer(func, 1)
+        iters, _ = _autorange(timer)
+        return min(iters, int(self.max_iters))
+
+    def _measure_compile_time(self, test_case):
+        """ Measure the time (unit: second) of the first JIT forward run, which
+        traces and compiles the graph. It is reported separately so that the
+        compilation doesn't pollute the steady-state execution time.
+        """
+        start_time = timeit.default_timer()
+        test_case.run_jit_forward(1)
+        if test_case._is_cuda:
+            torch.cuda.synchronize()
+        return timeit.default_timer() - start_time
+
+    def _jit_specialize(self, test_case):
+        """ The JIT profiling executor records shape and type information during
+        the first two runs of a graph and only then specializes it, so those runs
+        are much slower than the steady state. Run them outside of the timed region.
+        """
+        for _ in range(2):
+            test_case.run_jit_forward(1)
+        if test_case._is_cuda:
+            torch.cuda.synchronize()
+
+    def _warmup(self, launch_test, test_case, iters):
+        """ Run the operator until the accumulated execution time exceeds
+        warmup_ms, so that JIT profiling runs are done and the device has
+        reached a steady state before measuring. The operator is run at least
+        once with <iters> iterations and the iteration count grows after each run.
+        """
+        warmup_ns = int(self.args.warmup_ms * 1e6)
+        warmup_time_ns = launch_test(test_case, iters)
+        while warmup_time_ns < warmup_ns:
+            iters = self._predict_num_iter_needed(max(iters, 1))
+            warmup_time_ns += launch_test(test_case, iters)
+
     def _measure_time(self, launch_test, test_case, iters):
         """
-        This function execute the operator for <iters> iterations then look at the time. 
-        If it's not significant, the number of iterations will be increased before rerun. 
-        The execution stops when the time becomes significant.
+        This function execute the operator for <iters> iterations <repeats> times then
+        look at the median time and its coefficient of variation. If it's not significant,
+        the number of iterations will be increased before rerun. The execution stops when
+        the time becomes significant. A noisy operator is rerun at most max_cv_retries
+        times because of its variation, then its median is reported with the CV it has.
+        The median time per iteration (unit: us) and the coefficient of variation are
+        returned.
         """
-        curr_test_total_time = 0
+        curr_test_total_ns = 0
+        cv_retries = 0
         while True:
-            run_time_sec = launch_test(test_case, iters)
-            curr_test_total_time += run_time_sec
+            run_times_ns = [launch_test(test_case, iters) for _ in range(self.args.repeats)]
+            curr_test_total_ns += sum(run_times_ns)
+            run_time_ns = int(np.median(run_times_ns))
+            run_time_cv = 0.0
+            if len(run_times_ns) > 1:
+                run_time_cv = np.std(run_times_ns, ddof=1) / np.mean(run_times_ns)
             # Analyze time after each run to decide if the result is stable
             results_are_significant = self._iteration_result_is_significant(
-                iters, run_time_sec, curr_test_total_time, self.has_explicit_iteration_count)
+                iters, run_time_ns, run_time_cv, cv_retries, curr_test_total_ns,
+                self.has_explicit_iteration_count)
 
             if results_are_significant:
                 break
 
+            if (run_time_ns > self.predefined_minimum_ns and
+                    run_time_cv > self.args.max_cv):
+                # Only the variation keeps the result from being reported,
+                # the number of such retries is bounded by max_cv_retries.
+                cv_retries += 1
+
             # Re-estimate the hopefully-sufficient
             # iteration count, and run the benchmark again...
             iters = self._predict_num_iter_needed(iters)
 
-        reported_run_time_us = (1e6 * run_time_sec / iters)
-        return reported_run_time_us
+        reported_run_time_us = (run_time_ns / 1e3 / iters)
+        return reported_run_time_us, run_time_cv
 
     def _check_keep(self, test_flag, cmd_flag):
         return (cmd_flag is None or test_flag == cmd_flag)
@@ -194,14 +523,11 @@ class BenchmarkRunner(object):
             return True
         return False
 
-    def _keep_test(self, test_case):
+    def _keep_test(self, test_case, frameworks):
         # TODO: consider regex matching for test filtering.
         # Currently, this is a sub-string matching.
         op_test_config = test_case.test_config
 
-        if self.args.framework:
-            frameworks = benchmark_utils.get_requested_frameworks(self.args.framework)
-
         # Filter framework, operator, test_name, tag, forward_only
         if (self._check_keep(op_test_config.test_name, self.args.test_name) and
             self._check_keep(op_test_config.tag, self.args.tag_filter) and
@@ -212,38 +538,140 @@ class BenchmarkRunner(object):
 
         return False
 
+    def _candidate_tests(self, frameworks):
+        """ Return the ids of the tests to check with _keep_test. Only the
+        smallest registration index matching the operator, tag or framework
+        filter is walked, in registration order, and _keep_test applies the
+        other filters to each candidate.
+        """
+        indexes = []
+        if self.args.operator is not None:
+            indexes.append(_BY_OP.get(self.args.operator, []))
+        if self.args.tag_filter is not None:
+            indexes.append(_BY_TAG.get(self.args.tag_filter, []))
+        # The framework index only narrows the search when a single framework
+        # is requested and other frameworks have registered tests, the
+        # default of all frameworks covers every test.
+        if (frameworks is not None and len(set(frameworks)) == 1 and
+                set(_BY_FRAMEWORK) != set(frameworks)):
+            indexes.append(_BY_FRAMEWORK.get(frameworks[0], []))
+        if not indexes:
+            return list(BENCHMARK_TESTER)
+        return min(indexes, key=len)
+
+    def _print_test_name(self, test_case):
+        print("# Benchmarking {}: {}".format(
+            test_case.framework,
+            test_case.op_bench.module_name()))
+
+    def _run_one(self, full_test_id, test_case):
+        """ Warm up and measure a single test case. The execution times (unit: us),
+        their coefficients of variation and the JIT compile time (None if it
+        doesn't apply) are returned.
+        """
+        op_test_config = test_case.test_config 
+        framework = test_case.framework
+
+        # Inputs are allocated once here and shared by the warmup and
+        # all measurement runs. init already drew from the generators when the
+        # test was generated and other tests may have run since, so re-seed
+        # them to keep the inputs independent of the selected tests and
+        # their order.
+        op_bench = test_case.op_bench
+        if op_bench.random_seed is not None:
+            op_bench.set_random_seed(op_bench.random_seed)
+        op_bench.prepare_inputs(rng=op_bench.rng)
+
+        self._bind_launchers(test_case)
+        if op_test_config.run_backward:
+            # The backward path retains the graph of the output, so the
+            # forward path only runs once for all the backward launches.
+            test_case._prepare_bwd()
+            launch_func = self._launch_backward
+        else: 
+            launch_func = self._launch_forward
+
+        compile_time = None
+        if (self.use_jit and framework == "PyTorch" and
+                not op_test_config.run_backward):
+            compile_time = self._measure_compile_time(test_case)
+            self._jit_specialize(test_case)
+
+        # Warmup
+        self._warmup(launch_func, test_case,
+                     self.pt_warmup_iters if framework == "PyTorch" else self.warmup_iters)
+        # Actual Execution
+        iters = self.iters
+        if not self.has_explicit_iteration_count:
+            iters = self._autorange_iters(test_case)
+        results = [self._measure_time(launch_func, test_case, iters) 
+                   for _ in range(self.num_runs)]
+        reported_time = [result[0] for result in results]
+        reported_cv = [result[1] for result in results]
+        # The timers hold the launchers of this test, don't keep them alive
+        # for the rest of the run.
+        self._timers.clear()
+        return reported_time, reported_cv, compile_time
+
+    def _run_parallel(self, active_tests):
+        """ Run the tests in a pool of --jobs processes and return their results
+        in the order of active_tests. Each worker is pinned to a disjoint set of
+        CPUs so that the workers don't compete for cores.
+        """
+        num_workers = self.args.jobs
+        cpu_sets = None
+        if hasattr(os, 'sched_getaffinity'):
+            cpus = sorted(os.sched_getaffinity(0))
+            num_workers = min(num_workers, len(cpus))
+            chunk = len(cpus) // num_workers
+            cpu_sets = [set(cpus[i * chunk:(i + 1) * chunk]) for i in range(num_workers)]
+
+        # Imported here since concurrent.futures isn't available on Python 2
+        import concurrent.futures
+        mp_context = multiprocessing.get_context('spawn')
+        worker_counter = mp_context.Value('i', 0)
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=num_workers, mp_context=mp_context,
+                initializer=_init_worker,
+                initargs=(self.args, worker_counter, cpu_sets)) as executor:
+            return list(executor.map(
+                _run_in_worker, [full_test_id for full_test_id, _ in active_tests]))
+
     def run(self):
         self._print_header()
 
         if self.args.list_ops or self.args.list_tests:
             return
 
-        for full_test_id, test_case in BENCHMARK_TESTER.items():
-            op_test_config = test_case.test_config 
-
-            if not self._keep_test(test_case):
-                continue
-
-            # To reduce variance, fix a numpy randseed to the test case,
-            # so that the randomly generated input tensors remain the
-            # same for each test case.
-            # The random seed is limited to 32-bit because of numpy
-            # requirement.
-            np.random.seed(seed=hash(full_test_id) & ((1 << 32) - 1))
-
-            print("# Benchmarking {}: {}".format(
-                test_case.framework,
-                test_case.op_bench.module_name()))
-
-            if op_test_config.run_backward:
-                launch_func = self._launch_backward
-            else: 
-                launch_func = self._launch_forward
-
-            # Warmup
-            launch_func(test_case, self.args.warmup_iterations)
-            # Actual Execution
-            reported_time = [self._measure_time(launch_func, test_case, self.iters) 
-                             for _ in range(self.num_runs)]
+        # Parse the requested frameworks once instead of once per test
+        frameworks = None
+        if self.args.framework:
+            frameworks = benchmark_utils.get_requested_frameworks(self.args.framework)
+        active_tests = [(full_test_id, BENCHMARK_TESTER[full_test_id])
+                        for full_test_id in self._candidate_tests(frameworks)
+                        if self._keep_test(BENCHMARK_TESTER[full_test_id], frameworks)]
+
+        # Bind the attributes used in the loop to locals once
+        run_one = self._run_one
+        print_test_name = self._print_test_name
+        print_perf_result = self._print_perf_result
+
+        if self.args.jobs > 1 and sys.version_info < (3, 7):
+            print("# --jobs needs Python 3.7 or newer, running tests serially")
+            self._pin_cpu()
+        elif self.args.jobs > 1 and any(self._is_gpu_test(test_case)
+                                        for _, test_case in active_tests):
+            print("# --jobs is ignored because CUDA tests can't share the device, "
+                  "running tests serially")
+            self._pin_cpu()
+        elif self.args.jobs > 1:
+            for (_, test_case), result in zip(active_tests, self._run_parallel(active_tests)):
+                print_test_name(test_case)
+                reported_time, reported_cv, compile_time = result
+                print_perf_result(reported_time, reported_cv, compile_time, test_case)
+            return
 
-            self._print_perf_result(reported_time, test_case)
+        for full_test_id, test_case in active_tests:
+            print_test_name(test_case)
+            reported_time, reported_cv, compile_time = run_one(full_test_id, test_case)
+            print_perf_result(reported_time, reported_cv, compile_time, test_case)
@@ -4,6 +4,8 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import benchmark_core
+import benchmark_utils
+import numpy as np
 import torch
 import cpp_extension # noqa
 
@@ -18,16 +20,43 @@ class TorchBenchmarkBase(object):
     """ This is a base class used to create Pytorch operator benchmark.
         module_name is the name of the operator being benchmarked. 
         test_name is the name (it's created by concatenating all the 
-        inputs) of a specific test
+        inputs) of a specific test. device (a string or a torch.device) is
+        where the input tensors live, it is inferred from the tensors
+        created in init when it is not set explicitly.
     """
 
     def __init__(self):
         self.user_given_name = None
         self._jit_forward = None
+        self.device = None
+        self.rng = np.random
+        self.random_seed = None
 
     def forward(self):
         pass 
 
+    def set_random_seed(self, seed):
+        """ This is called with a seed derived from the test before init, and
+            again before prepare_inputs, so that the randomly generated input
+            tensors remain the same for each test case. torch.rand* draws from
+            the seeded torch generator and self.rng is a numpy RandomState
+            seeded for the test.
+        """
+        self.random_seed = seed
+        torch.manual_seed(seed)
+        self.rng = benchmark_utils.random_state(seed)
+
+    def prepare_inputs(self, rng):
+        """ This is called once right before a test is warmed up and measured,
+            the default does nothing. Input tensors should be created in init,
+            forward then reuses them for every run so nothing is allocated in
+            the timed loop. Only override this method for inputs too large to
+            keep for every registered test, it only runs for the selected
+            tests. rng is self.rng, re-seeded for the test just like the torch
+            generator, so these inputs are the same on every run.
+        """
+        pass
+
     def _wrap_forward(self, foo):
         """ The function passed to JIT trace must have at least one argument, 
             this function is to wrap the forward method to meet that requirement. 
@@ -52,6 +81,24 @@ class TorchBenchmarkBase(object):
             return result
         return _jit_forward_graph
 
+    def _infer_device(self):
+        """ infer the device the benchmark runs on from the tensors created
+            in the init method. Tensors stored directly as attributes or in
+            list, tuple or dict attributes are checked, tensors nested deeper
+            are not, set device explicitly in that case.
+        """
+        for value in self.__dict__.values():
+            if isinstance(value, dict):
+                values = value.values()
+            elif isinstance(value, (list, tuple)):
+                values = value
+            else:
+                values = [value]
+            for item in values:
+                if isinstance(item, torch.Tensor) and item.is_cuda:
+                    return 'cuda'
+        return 'cpu'
+
     def module_name(self):
         """ this is used to label the operator being benchmarked
         """
@@ -80,7 +127,7 @@ class PyTorchOperatorTestCase(object):
     """ This class includes all the information needed to benchmark an operator. 
         op_bench: it's a user-defined class (child of TorchBenchmarkBase)
         which includes input and operator, .etc
-        test_config: a namedtuple includes test_name, input_shape, tag, run_backward.
+        test_config: a TestConfig includes test_name, input_shape, tag, run_backward.
         When run_backward is false, the run_forward method will be executed, 
         When run_backward is true, run_forward_eager and _output_mean will be 
         executed to generate output. Then, run_backward will be executed.
@@ -90,6 +137,8 @@ class PyTorchOperatorTestCase(object):
         self.op_bench = op_bench
         self.place_holder_tensor = torch.ones(1)
         self.framework = "PyTorch"
+        if self.op_bench.device is None:
+            self.op_bench.device = self.op_bench._infer_device()
 
     def run_jit_forward(self, num_runs):
         """ Run the forward path of an op with JIT mode
@@ -5,8 +5,6 @@ from __future__ import unicode_literals
 
 import argparse
 
-from caffe2.python import workspace
-
 import benchmark_core
 import benchmark_utils
 
@@ -63,6 +61,30 @@ def main():
         default=1,
     )
 
+    parser.add_argument(
+        "--repeats",
+        help="Number of times each measurement is repeated, the median time is reported. "
+        "At least 2 repeats are needed to compute the coefficient of variation",
+        type=int,
+        default=5,
+    )
+
+    parser.add_argument(
+        "--max_cv",
+        help="Keep increasing the number of iterations until the coefficient of variation "
+        "across repeats is below this value",
+        type=float,
+        default=0.01,
+    )
+
+    parser.add_argument(
+        "--max_cv_retries",
+        help="Maximum number of times the number of iterations is increased because the "
+        "coefficient of variation is above --max_cv, the result is reported afterwards",
+        type=int,
+        default=3,
+    )
+
     parser.add_argument(
         "--min_time_per_test",
         help="Set the minimum time (unit: seconds) to run each test",
@@ -77,6 +99,21 @@ def main():
         type=int
     )
 
+    parser.add_argument(
+        "--min_warmup_runs",
+        help="Minimum number of warmup iterations of PyTorch operators, the JIT "
+        "profiling executor needs two runs before it specializes a graph",
+        default=2,
+        type=int
+    )
+
+    parser.add_argument(
+        "--warmup_ms",
+        help="Keep warming up until the accumulated execution time (unit: ms) exceeds this value",
+        default=50,
+        type=float
+    )
+
     parser.add_argument(
         "--omp_num_threads",
         help="Number of OpenMP threads used in PyTorch/Caffe2 runtime",
@@ -91,6 +128,30 @@ def main():
         type=int
     )
 
+    parser.add_argument(
+        "--num_threads",
+        help="Number of threads used by PyTorch (torch.set_num_threads). It defaults to "
+        "--omp_num_threads if that is set and to 1 otherwise, 0 keeps the PyTorch default",
+        default=None,
+        type=int
+    )
+
+    parser.add_argument(
+        "--pin_cpu",
+        help="Pin the benchmark process to the given CPU, it is not used when --jobs runs "
+        "tests in parallel since each worker is pinned to its own CPUs",
+        default=None,
+        type=int
+    )
+
+    parser.add_argument(
+        "--jobs",
+        help="Number of processes running tests in parallel, each pinned to its own CPUs. "
+        "Only used on Python 3.7+ when no CUDA test (PyTorch or Caffe2) is selected",
+        default=1,
+        type=int
+    )
+
     parser.add_argument(
         "--ai_pep_format",
         help="Print result when running on AI-PEP",
@@ -104,6 +165,14 @@ def main():
         action='store_true'
     )
 
+    parser.add_argument(
+        "--use_autograd_profiler",
+        help="Measure CUDA operators with the autograd profiler, which only counts "
+        "the time spent on the device. Only a few iterations are profiled and the "
+        "time is scaled to the iteration count",
+        action='store_true'
+    )
+
     parser.add_argument(
         "--forward_only",
         help="Only run the forward path of operators",
@@ -117,9 +186,11 @@ def main():
 
     args = parser.parse_args()
 
+    if args.repeats < 2:
+        parser.error("--repeats must be at least 2, got {}".format(args.repeats))
+
     if benchmark_utils.is_caffe2_enabled(args.framework):
-        workspace.GlobalInit(['caffe2', '--caffe2_log_level=0'])
-        workspace.ClearGlobalNetObserver()
+        benchmark_utils.init_caffe2_workspace()
     if args.omp_num_threads:
         benchmark_utils.set_omp_threads(args.omp_num_threads)
     if args.mkl_num_threads:
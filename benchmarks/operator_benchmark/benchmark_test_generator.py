@@ -6,6 +6,7 @@ from __future__ import unicode_literals
 from collections import namedtuple
 import copy 
 from benchmark_core import TestConfig
+import benchmark_utils
 from benchmark_caffe2 import register_caffe2_op_test_case
 from benchmark_pytorch import register_pytorch_op_test_case
 
@@ -43,10 +44,15 @@ def _generate_test(configs, bench_op, OperatorTestCase, run_backward, op_name_fu
         # op_function is concatenated with the input dict then passed to the init function 
         # op_name is passed to the set_module_name function
         init_dict = copy.deepcopy(test_attrs)
+        op_name = None
         if op_name_function is not None:
             op_name = op_name_function['op_name']
             init_dict.update({'op_func' : op_name_function['op_func']})
             op.set_module_name(op_name)
+        # Seed the input generation of the test before init creates the
+        # inputs, the key doesn't depend on the order tests are generated in
+        op.set_random_seed(benchmark_utils.stable_seed('{}_{}_{}'.format(
+            bench_op.__name__, op_name, sorted(test_attrs.items()))))
         op.init(**init_dict)
         test_name = op.test_name(**test_attrs)
         input_config = str(test_attrs)[1:-1].replace('\'', '')
@@ -90,6 +96,8 @@ def generate_c2_test_from_ops(ops_metadata, bench_op, tags):
                            op_metadata.args)
         test_attrs = tmp_attrs._asdict()
         op = bench_op()
+        op.set_random_seed(benchmark_utils.stable_seed('{}_{}'.format(
+            bench_op.__name__, sorted(test_attrs.items()))))
         op.init(**test_attrs)
         test_name = op.test_name("short")
         input_config = "Shapes: {}, Type: {}, Args: {}".format(
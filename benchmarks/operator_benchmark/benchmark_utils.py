@@ -4,10 +4,13 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 import numpy as np
+import hashlib
 import itertools
 import random
 import os
 
+from caffe2.python import workspace
+
 
 """Performance microbenchmarks's utils.
 
@@ -33,6 +36,22 @@ def numpy_random(dtype, *shapes):
     return np.random.rand(*shapes).astype(dtype)
 
 
+def stable_seed(key):
+    """ Return a 32-bit random seed derived from a string key. Python's hash
+        is salted per process, the digest gives the same seed across runs.
+    """
+    return int(hashlib.md5(key.encode('utf-8')).hexdigest()[:8], 16)
+
+
+def random_state(seed):
+    """ Return a numpy RandomState seeded with seed. It is backed by PCG64
+        on numpy 1.17+ and falls back to the legacy MT19937 otherwise.
+    """
+    if hasattr(np.random, 'PCG64'):
+        return np.random.RandomState(np.random.PCG64(seed))
+    return np.random.RandomState(seed)
+
+
 def set_omp_threads(num_threads): 
     existing_value = os.environ.get('OMP_NUM_THREADS', '')
     if existing_value != '': 
@@ -49,6 +68,13 @@ def set_mkl_threads(num_threads):
     os.environ["MKL_NUM_THREADS"] = str(num_threads)
 
 
+def init_caffe2_workspace():
+    """ Initialize the Caffe2 runtime used by the benchmarks.
+    """
+    workspace.GlobalInit(['caffe2', '--caffe2_log_level=0'])
+    workspace.ClearGlobalNetObserver()
+
+
 def cross_product(*inputs):
     """
     Return a list of cartesian product of input iterables.